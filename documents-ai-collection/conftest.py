@@ -0,0 +1,48 @@
+"""Pytest configuration for the desktop assistant tests"""
+
+import sys
+import types
+
+# Command routing and the other non-GUI logic live in modules that import PyQt5 at the
+# top. Without Qt installed, register stand-in PyQt5 modules so those modules still
+# import and their pure functions can be tested; nothing here creates a real widget.
+try:
+    import PyQt5  # noqa: F401
+except ImportError:
+    class QtStub:
+        """Accepts any arguments, attribute access or call"""
+
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __call__(self, *args, **kwargs):
+            return QtStub()
+
+        def __getattr__(self, name):
+            return QtStub()
+
+        def __or__(self, other):
+            return self
+
+    def stub_module(name):
+        module = types.ModuleType(name)
+        classes = {}
+
+        def module_getattr(attr):
+            # One distinct class per name, so "class X(QObject, QRunnable)" still works
+            if attr.startswith('__'):
+                raise AttributeError(attr)
+            if attr not in classes:
+                classes[attr] = type(attr, (QtStub,), {})
+            return classes[attr]
+
+        module.__getattr__ = module_getattr
+        return module
+
+    package = types.ModuleType('PyQt5')
+    package.__path__ = []
+    sys.modules['PyQt5'] = package
+    for submodule in ('QtWidgets', 'QtCore', 'QtGui'):
+        module = stub_module(f'PyQt5.{submodule}')
+        setattr(package, submodule, module)
+        sys.modules[f'PyQt5.{submodule}'] = module
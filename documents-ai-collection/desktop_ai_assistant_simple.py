@@ -15,17 +15,22 @@ from datetime import datetime, timedelta
 import json
 from pathlib import Path
 import threading
+import queue
 import sqlite3
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import hashlib
+import zlib
 import re
 import random
+from collections import OrderedDict, deque
 
 # PyQt5 imports
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout,
                              QTextEdit, QPushButton, QLineEdit, QLabel,
                              QSystemTrayIcon, QMenu, QAction, QMessageBox, QFrame)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint
+from PyQt5.QtCore import Qt, QThread, QRunnable, QThreadPool, pyqtSignal, QTimer, QPoint
 from PyQt5.QtGui import QIcon, QPixmap, QPainter, QColor, QFont
 
 # Voice recognition imports
@@ -41,6 +46,61 @@ except Exception as e:
     print(f"VOICE: Error loading voice modules: {e}")
     VOICE_AVAILABLE = False
 
+# Text-to-speech voice picked on first run; later starts skip enumerating the system voices
+VOICE_SETTINGS_FILE = Path.home() / ".desktop_ai_voice.json"
+
+# Emoji dropped (or spelled out) before a response is spoken, applied in one translate() pass
+SPEECH_STRIP_TABLE = str.maketrans({'✅': '', '❌': '', '🤖': 'AI', '💡': '', '🔧': '', '🧹': ''})
+
+# On-device recognition: faster-whisper on microphone audio cut into phrases by WebRTC VAD
+LOCAL_ASR_AVAILABLE = False
+try:
+    import numpy as np
+    import sounddevice as sd
+    import webrtcvad
+    from faster_whisper import WhisperModel
+    LOCAL_ASR_AVAILABLE = True
+    print("VOICE: Local Whisper recognition available!")
+except ImportError as e:
+    print(f"VOICE: Local Whisper recognition not available, using Google: {e}")
+except Exception as e:
+    print(f"VOICE: Error loading local recognition modules: {e}")
+    LOCAL_ASR_AVAILABLE = False
+
+# Float samples to 16-bit PCM for the VAD: one fused native loop when Numba is installed
+NUMBA_AVAILABLE = False
+if LOCAL_ASR_AVAILABLE:
+    try:
+        from numba import njit
+        NUMBA_AVAILABLE = True
+    except ImportError:
+        pass
+
+if NUMBA_AVAILABLE:
+    @njit("int16[:](float32[:])", cache=True)
+    def float_to_pcm16(samples):
+        """Convert float32 samples in [-1, 1] to 16-bit PCM, clipping out-of-range values"""
+        pcm = np.empty(samples.shape[0], dtype=np.int16)
+        for i in range(samples.shape[0]):
+            value = samples[i] * 32768.0
+            if value > 32767.0:
+                value = 32767.0
+            elif value < -32768.0:
+                value = -32768.0
+            pcm[i] = np.int16(value)
+        return pcm
+else:
+    def float_to_pcm16(samples):
+        """Convert float32 samples in [-1, 1] to 16-bit PCM, clipping out-of-range values"""
+        return np.clip(samples * 32768.0, -32768, 32767).astype(np.int16)
+
+WHISPER_MODEL_SIZE = "small.en"
+VAD_SAMPLE_RATE = 16000
+VAD_FRAME_SAMPLES = 480        # 30 ms frames
+VAD_SILENCE_FRAMES = 10        # 300 ms of silence ends a phrase
+VAD_MIN_SPEECH_FRAMES = 4      # shorter bursts (clicks, taps) are dropped
+VAD_MAX_PHRASE_FRAMES = 166    # 5 s, the same limit as phrase_time_limit below
+
 class VoiceWorker(QThread):
     """Simple voice recognition worker"""
     voice_detected = pyqtSignal(str)
@@ -53,34 +113,116 @@ class VoiceWorker(QThread):
         self.listening = False
         self.running = True
 
+        # Local Whisper model, loaded on this thread the first time listening starts
+        # (None: not loaded yet, False: unavailable, use Google recognition)
+        self.asr_model = None
+        self.vad = None
+
     def run(self):
         """Voice recognition loop"""
         while self.running:
             if self.listening:
+                # Open the microphone and calibrate once per listening session, not per
+                # phrase; the recognizer keeps adapting its energy threshold as it listens
                 try:
-                    with sr.Microphone() as source:
-                        self.recognizer.adjust_for_ambient_noise(source, duration=0.5)
-                        self.status_update.emit("VOICE: Listening...")
-
-                        audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
-
-                        self.status_update.emit("VOICE: Processing...")
-                        text = self.recognizer.recognize_google(audio, language='en-US')
-
-                        if text and len(text.strip()) > 0:
-                            self.voice_detected.emit(text)
-                            self.status_update.emit("VOICE: Command received!")
-
-                except sr.WaitTimeoutError:
-                    self.status_update.emit("VOICE: No speech detected")
-                except sr.UnknownValueError:
-                    self.status_update.emit("VOICE: Didn't understand")
+                    if self.load_local_asr():
+                        self.listen_loop_local()
+                    else:
+                        with sr.Microphone() as source:
+                            self.recognizer.adjust_for_ambient_noise(source, duration=1.0)
+                            self.listen_loop(source)
                 except Exception as e:
                     self.error_occurred.emit(f"VOICE: Error - {e}")
                     time.sleep(2)
             else:
                 time.sleep(0.1)
 
+    def listen_loop(self, source):
+        """Recognize phrases from an open microphone until listening stops"""
+        while self.running and self.listening:
+            try:
+                self.status_update.emit("VOICE: Listening...")
+
+                audio = self.recognizer.listen(source, timeout=5, phrase_time_limit=5)
+
+                self.status_update.emit("VOICE: Processing...")
+                text = self.recognizer.recognize_google(audio, language='en-US')
+
+                if text and len(text.strip()) > 0:
+                    self.voice_detected.emit(text)
+                    self.status_update.emit("VOICE: Command received!")
+
+            except sr.WaitTimeoutError:
+                self.status_update.emit("VOICE: No speech detected")
+            except sr.UnknownValueError:
+                self.status_update.emit("VOICE: Didn't understand")
+            except sr.RequestError as e:
+                # Recognition service unreachable; other errors reopen the microphone in run()
+                self.error_occurred.emit(f"VOICE: Error - {e}")
+                time.sleep(2)
+
+    def load_local_asr(self):
+        """Load the Whisper model and VAD once; return False to fall back to Google"""
+        if self.asr_model is None:
+            self.asr_model = False
+            if LOCAL_ASR_AVAILABLE:
+                try:
+                    self.status_update.emit("VOICE: Loading speech model...")
+                    self.asr_model = WhisperModel(WHISPER_MODEL_SIZE, device="cpu", compute_type="int8")
+                    self.vad = webrtcvad.Vad(3)
+                except Exception as e:
+                    print(f"VOICE: Whisper model failed to load, using Google: {e}")
+        return bool(self.asr_model)
+
+    def listen_loop_local(self):
+        """Transcribe VAD-cut phrases on the device until listening stops"""
+        # The stream's own buffer is far shorter than one transcription, so the callback
+        # copies every block into an unbounded queue; speech heard meanwhile waits there
+        captured = queue.Queue()
+
+        def on_audio(indata, frames, time_info, status):
+            if status.input_overflow:
+                print("VOICE: Microphone input overflowed, some audio was dropped")
+            captured.put(indata[:, 0].copy())
+
+        with sd.InputStream(samplerate=VAD_SAMPLE_RATE, channels=1, dtype='float32',
+                            blocksize=VAD_FRAME_SAMPLES, callback=on_audio):
+            self.status_update.emit("VOICE: Listening...")
+            for phrase in self.speech_phrases(captured):
+                self.status_update.emit("VOICE: Processing...")
+                segments, _ = self.asr_model.transcribe(phrase, language="en", beam_size=1)
+                text = " ".join(segment.text for segment in segments).strip()
+
+                if text:
+                    self.voice_detected.emit(text)
+                    self.status_update.emit("VOICE: Command received!")
+                else:
+                    self.status_update.emit("VOICE: Didn't understand")
+
+    def speech_phrases(self, captured):
+        """Yield each spoken phrase as float32 samples, cut at 300 ms of silence"""
+        phrase = []
+        speech_frames = silent_frames = 0
+        while self.running and self.listening:
+            try:
+                frame = captured.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if self.vad.is_speech(float_to_pcm16(frame).tobytes(), VAD_SAMPLE_RATE):
+                speech_frames += 1
+                silent_frames = 0
+            elif not phrase:
+                continue
+            else:
+                silent_frames += 1
+            phrase.append(frame)
+
+            if silent_frames >= VAD_SILENCE_FRAMES or len(phrase) >= VAD_MAX_PHRASE_FRAMES:
+                if speech_frames >= VAD_MIN_SPEECH_FRAMES:
+                    yield np.concatenate(phrase)
+                phrase = []
+                speech_frames = silent_frames = 0
+
     def stop_thread(self):
         """Stop the voice recognition thread"""
         self.running = False
@@ -94,6 +236,26 @@ class VoiceWorker(QThread):
         """Stop voice recognition"""
         self.listening = False
 
+# Settings applied to every knowledge database connection: WAL with NORMAL sync so a
+# commit does not fsync the whole database, a 64 MB page cache, temp tables in memory,
+# memory-mapped reads, and a short wait instead of "database is locked" errors
+SQLITE_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-64000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA busy_timeout=5000",
+    # INSERT OR REPLACE fires delete triggers (which keep knowledge_fts in step) only with this on
+    "PRAGMA recursive_triggers=ON",
+)
+
+# Parsed API responses kept in memory in front of the SQLite api_cache table
+API_CACHE_SIZE = 256
+
+# Learning history rows are queued and written in one transaction this often (ms)
+LEARNING_FLUSH_INTERVAL = 5000
+
 class KnowledgeManager:
     """Advanced knowledge management system with SQLite database and API integration"""
 
@@ -101,13 +263,47 @@ class KnowledgeManager:
         self.db_path = Path.home() / ".desktop_ai_knowledge.db"
         self.knowledge_dir = Path.home() / ".desktop_ai_knowledge"
         self.knowledge_dir.mkdir(exist_ok=True)
+
+        # One connection for the app's lifetime, so the page cache stays warm between calls.
+        # Chat and voice workers share it; self.lock serializes access. Autocommit mode.
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.db_path, check_same_thread=False, isolation_level=None)
+        self.configure_connection(self.conn)
+        self.fts_available = False
         self.init_database()
 
+        # query_hash -> (response JSON bytes, expires_at), least recently used first; each hit
+        # parses its own copy, so a caller mutating a response cannot corrupt the cache
+        self.memory_cache = OrderedDict()
+
+        # learning_history rows waiting for flush_learning()
+        self.pending_learning = deque()
+
+        # Pooled keep-alive connections, so repeat API hosts skip the TCP/TLS handshake
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8,
+                              max_retries=Retry(total=2, backoff_factor=0.2))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def close(self):
+        """Write queued learning rows and close the database and HTTP connections"""
+        self.flush_learning()
+        self.session.close()
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def configure_connection(conn):
+        """Apply SQLITE_PRAGMAS to a connection (all but journal_mode are per connection)"""
+        for pragma in SQLITE_PRAGMAS:
+            conn.execute(pragma)
+
     def init_database(self):
         """Initialize SQLite database for knowledge storage"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            with self.lock:
+                cursor = self.conn.cursor()
 
                 # Knowledge base table
                 cursor.execute('''
@@ -133,36 +329,88 @@ class KnowledgeManager:
                     )
                 ''')
 
-                # API cache table
+                # API cache table: keyed by the query hash alone, response stored as zlib-compressed JSON
+                columns = [row[1] for row in cursor.execute("PRAGMA table_info(api_cache)")]
+                if 'api_name' in columns:
+                    # Old layout; the rows are only a cache, so start it afresh
+                    cursor.execute('DROP TABLE api_cache')
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS api_cache (
-                        id INTEGER PRIMARY KEY,
-                        api_name TEXT,
-                        query_hash TEXT UNIQUE,
-                        response TEXT,
-                        timestamp TIMESTAMP,
+                        query_hash TEXT PRIMARY KEY,
+                        response BLOB,
                         expires_at TIMESTAMP
-                    )
+                    ) WITHOUT ROWID
                 ''')
 
-                conn.commit()
+                # Recent activity in get_learning_stats reads the newest rows first
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_learning_history_timestamp ON learning_history(timestamp)')
+
+                self.fts_available = self.init_search_index(cursor)
                 print("Knowledge database initialized successfully")
 
         except Exception as e:
             print(f"Database initialization error: {e}")
 
+    def init_search_index(self, cursor):
+        """Create the full-text index over knowledge; return False if this SQLite lacks FTS5 trigram"""
+        try:
+            exists = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'knowledge_fts'").fetchone()
+            # Trigram tokens answer the same case-insensitive substring queries as LIKE '%q%'
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+                    topic, content, content='knowledge', content_rowid='id', tokenize='trigram'
+                )
+            ''')
+            # Keep the index in step with the table
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_insert AFTER INSERT ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(rowid, topic, content) VALUES (new.id, new.topic, new.content);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_delete AFTER DELETE ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(knowledge_fts, rowid, topic, content)
+                    VALUES ('delete', old.id, old.topic, old.content);
+                END
+            ''')
+            cursor.execute('''
+                CREATE TRIGGER IF NOT EXISTS knowledge_fts_update AFTER UPDATE ON knowledge BEGIN
+                    INSERT INTO knowledge_fts(knowledge_fts, rowid, topic, content)
+                    VALUES ('delete', old.id, old.topic, old.content);
+                    INSERT INTO knowledge_fts(rowid, topic, content) VALUES (new.id, new.topic, new.content);
+                END
+            ''')
+            if not exists:
+                # Index the rows stored before the index existed
+                cursor.execute("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')")
+            return True
+        except sqlite3.OperationalError as e:
+            print(f"Full-text search unavailable, using LIKE scans: {e}")
+            return False
+
     def search_knowledge(self, query):
         """Search local knowledge base"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT topic, content, source_url, confidence
-                    FROM knowledge
-                    WHERE topic LIKE ? OR content LIKE ?
-                    ORDER BY confidence DESC
-                    LIMIT 5
-                ''', (f'%{query}%', f'%{query}%'))
+            with self.lock:
+                cursor = self.conn.cursor()
+                # Trigrams need at least three characters; shorter queries scan with LIKE
+                if self.fts_available and len(query) >= 3:
+                    cursor.execute('''
+                        SELECT k.topic, k.content, k.source_url, k.confidence
+                        FROM knowledge_fts JOIN knowledge AS k ON k.id = knowledge_fts.rowid
+                        WHERE knowledge_fts MATCH ?
+                        ORDER BY k.confidence DESC
+                        LIMIT 5
+                    ''', ('"' + query.replace('"', '""') + '"',))
+                else:
+                    cursor.execute('''
+                        SELECT topic, content, source_url, confidence
+                        FROM knowledge
+                        WHERE topic LIKE ? OR content LIKE ?
+                        ORDER BY confidence DESC
+                        LIMIT 5
+                    ''', (f'%{query}%', f'%{query}%'))
 
                 results = cursor.fetchall()
                 return results
@@ -173,22 +421,38 @@ class KnowledgeManager:
 
     def store_knowledge(self, topic, content, source_url="", confidence=0.5):
         """Store new knowledge in database"""
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT OR REPLACE INTO knowledge
-                    (topic, content, source_url, last_updated, confidence)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (topic, content, source_url, datetime.now(), confidence))
-                conn.commit()
+        self.store_many_knowledge([(topic, content, source_url, confidence)])
 
-                # Create text extension file
+    def store_many_knowledge(self, items):
+        """Store (topic, content, source_url, confidence) tuples in a single transaction"""
+        try:
+            now = datetime.now()
+            rows = [(topic, content, source_url, now, confidence)
+                    for topic, content, source_url, confidence in items]
+            self.write_many('''
+                INSERT OR REPLACE INTO knowledge
+                (topic, content, source_url, last_updated, confidence)
+                VALUES (?, ?, ?, ?, ?)
+            ''', rows)
+
+            # Create text extension files
+            for topic, content, source_url, _, _ in rows:
                 self.create_text_extension(topic, content, source_url)
 
         except Exception as e:
             print(f"Knowledge storage error: {e}")
 
+    def write_many(self, sql, rows):
+        """Run one statement for many rows inside a single transaction"""
+        with self.lock:
+            self.conn.execute('BEGIN')
+            try:
+                self.conn.executemany(sql, rows)
+                self.conn.execute('COMMIT')
+            except Exception:
+                self.conn.execute('ROLLBACK')
+                raise
+
     def create_text_extension(self, topic, content, source_url):
         """Create text-based extension file"""
         try:
@@ -211,35 +475,44 @@ class KnowledgeManager:
         try:
             # Create query hash for caching
             query_str = f"{api_name}_{url}_{str(params)}_{str(headers)}"
-            query_hash = hashlib.md5(query_str.encode()).hexdigest()
+            query_hash = hashlib.blake2b(query_str.encode(), digest_size=16).hexdigest()
+
+            # Check cache first: memory, then the database
+            now = datetime.now()
+            with self.lock:
+                cached = self.memory_cache.get(query_hash)
+                if cached and cached[1] > now:
+                    self.memory_cache.move_to_end(query_hash)
+                    return json.loads(cached[0])
 
-            # Check cache first
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+                cursor = self.conn.cursor()
                 cursor.execute('''
                     SELECT response, expires_at FROM api_cache
                     WHERE query_hash = ? AND expires_at > ?
-                ''', (query_hash, datetime.now()))
+                ''', (query_hash, now))
 
                 cached_result = cursor.fetchone()
                 if cached_result:
-                    return json.loads(cached_result[0])
+                    payload = zlib.decompress(cached_result[0])
+                    self.remember_response(query_hash, payload, datetime.fromisoformat(cached_result[1]))
+                    return json.loads(payload)
 
             # Make API call
-            response = requests.get(url, params=params, headers=headers, timeout=10)
+            response = self.session.get(url, params=params, headers=headers, timeout=10)
             response.raise_for_status()
             data = response.json()
 
             # Cache the result
             expires_at = datetime.now() + timedelta(minutes=cache_minutes)
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
+            payload = json.dumps(data).encode()
+            with self.lock:
+                cursor = self.conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO api_cache
-                    (api_name, query_hash, response, timestamp, expires_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (api_name, query_hash, json.dumps(data), datetime.now(), expires_at))
-                conn.commit()
+                    (query_hash, response, expires_at)
+                    VALUES (?, ?, ?)
+                ''', (query_hash, zlib.compress(payload), expires_at))
+                self.remember_response(query_hash, payload, expires_at)
 
             return data
 
@@ -247,6 +520,13 @@ class KnowledgeManager:
             print(f"API call error: {e}")
             return None
 
+    def remember_response(self, query_hash, payload, expires_at):
+        """Keep an API response's JSON bytes in the memory cache (caller holds self.lock)"""
+        self.memory_cache[query_hash] = (payload, expires_at)
+        self.memory_cache.move_to_end(query_hash)
+        if len(self.memory_cache) > API_CACHE_SIZE:
+            self.memory_cache.popitem(last=False)
+
     def get_real_weather(self, location="London"):
         """Get real weather data from API"""
         try:
@@ -273,19 +553,38 @@ class KnowledgeManager:
             return f"Weather service unavailable for {location}"
 
     def learn_from_query(self, query, response, source="user_interaction"):
-        """Store learning history"""
+        """Queue a learning history entry; flush_learning() writes it"""
+        self.pending_learning.append((query, response, source, datetime.now()))
+
+    def flush_learning(self):
+        """Write every queued learning history entry in one transaction"""
+        rows = []
+        while self.pending_learning:
+            rows.append(self.pending_learning.popleft())
+        if not rows:
+            return
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO learning_history
-                    (query, response, source, timestamp)
-                    VALUES (?, ?, ?, ?)
-                ''', (query, response, source, datetime.now()))
-                conn.commit()
+            self.write_many('''
+                INSERT INTO learning_history
+                (query, response, source, timestamp)
+                VALUES (?, ?, ?, ?)
+            ''', rows)
         except Exception as e:
+            # The transaction was rolled back; requeue the rows ahead of newer ones for the next flush
+            self.pending_learning.extendleft(reversed(rows))
             print(f"Learning storage error: {e}")
 
+class CommandTask(QRunnable):
+    """Run one chat command on a pooled thread"""
+
+    def __init__(self, assistant, message):
+        super().__init__()
+        self.assistant = assistant
+        self.message = message
+
+    def run(self):
+        self.assistant.run_command(self.message)
+
 class DesktopAI(QWidget):
     """Main Desktop AI Assistant Window"""
 
@@ -303,11 +602,13 @@ class DesktopAI(QWidget):
 
         # Initialize components
         self.conversation_history = []
+        self._history_dirty = False  # set by add_message, cleared by save_conversation_history
         self.load_conversation_history()
 
         # Voice components
         self.voice_recognizer = None
         self.voice_engine = None
+        self.tts_queue = None
         self.voice_worker = None
         self.voice_listening = False
         self.voice_output_enabled = True
@@ -319,6 +620,10 @@ class DesktopAI(QWidget):
         # Initialize knowledge management system
         self.knowledge_manager = KnowledgeManager()
 
+        # Reused worker threads for chat commands
+        self.pool = QThreadPool.globalInstance()
+        self.pool.setMaxThreadCount(4)
+
         # Initialize natural language processor
         self.nlp_processor = NaturalLanguageProcessor()
 
@@ -333,6 +638,11 @@ class DesktopAI(QWidget):
         self.save_timer.timeout.connect(self.save_conversation_history)
         self.save_timer.start(30000)
 
+        # Batched learning history writes
+        self.learning_timer = QTimer()
+        self.learning_timer.timeout.connect(self.knowledge_manager.flush_learning)
+        self.learning_timer.start(LEARNING_FLUSH_INTERVAL)
+
         # Connect signals for thread-safe GUI updates
         self.message_received.connect(self.add_message)
         self.status_updated.connect(self.update_status)
@@ -423,8 +733,6 @@ class DesktopAI(QWidget):
             self.voice_button.clicked.connect(self.toggle_voice_listening)
             self.voice_button.setStyleSheet("""
                 QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #48bb78, stop:1 #38a169);
                     color: white;
                     border: none;
                     border-radius: 25px;
@@ -432,11 +740,20 @@ class DesktopAI(QWidget):
                     font-weight: bold;
                     font-family: 'Segoe UI', sans-serif;
                 }
-                QPushButton:hover {
+                QPushButton[state="off"] {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #48bb78, stop:1 #38a169);
+                }
+                QPushButton[state="off"]:hover {
                     background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
                         stop:0 #38a169, stop:1 #2f855a);
                 }
+                QPushButton[state="on"] {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #e53e3e, stop:1 #c53030);
+                }
             """)
+            self.voice_button.setProperty("state", "off")
             input_layout.addWidget(self.voice_button)
 
             # Sound toggle button
@@ -444,8 +761,6 @@ class DesktopAI(QWidget):
             self.sound_button.clicked.connect(self.toggle_sound)
             self.sound_button.setStyleSheet("""
                 QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #ed8936, stop:1 #dd6b20);
                     color: white;
                     border: none;
                     border-radius: 25px;
@@ -454,7 +769,16 @@ class DesktopAI(QWidget):
                     font-family: 'Segoe UI', sans-serif;
                     font-size: 10px;
                 }
+                QPushButton[state="on"] {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #ed8936, stop:1 #dd6b20);
+                }
+                QPushButton[state="off"] {
+                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
+                        stop:0 #a0aec0, stop:1 #718096);
+                }
             """)
+            self.sound_button.setProperty("state", "on")
             input_layout.addWidget(self.sound_button)
 
         layout.addLayout(input_layout)
@@ -616,43 +940,26 @@ Just tell me what you need help with! 😊""")
             self.voice_worker.stop_thread()
             self.voice_worker.wait()  # Wait for thread to finish
         self.save_conversation_history()
+        self.knowledge_manager.close()
         QApplication.quit()
 
+    def set_button_state(self, button, state):
+        """Switch a button's [state] stylesheet selector without re-parsing the sheet"""
+        button.setProperty("state", state)
+        button.style().unpolish(button)
+        button.style().polish(button)
+
     def toggle_sound(self):
         """Toggle voice output on/off"""
         self.voice_output_enabled = not self.voice_output_enabled
 
         if self.voice_output_enabled:
             self.sound_button.setText("SOUND ON")
-            self.sound_button.setStyleSheet("""
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #ed8936, stop:1 #dd6b20);
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    padding: 10px 15px;
-                    font-weight: bold;
-                    font-family: 'Segoe UI', sans-serif;
-                    font-size: 10px;
-                }
-            """)
+            self.set_button_state(self.sound_button, "on")
             self.message_received.emit("System", "VOICE OUTPUT: ENABLED")
         else:
             self.sound_button.setText("SOUND OFF")
-            self.sound_button.setStyleSheet("""
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #a0aec0, stop:1 #718096);
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    padding: 10px 15px;
-                    font-weight: bold;
-                    font-family: 'Segoe UI', sans-serif;
-                    font-size: 10px;
-                }
-            """)
+            self.set_button_state(self.sound_button, "off")
             self.message_received.emit("System", "VOICE OUTPUT: DISABLED")
 
     def init_voice(self):
@@ -660,6 +967,15 @@ Just tell me what you need help with! 😊""")
         try:
             self.voice_recognizer = sr.Recognizer()
             self.voice_engine = pyttsx3.init()
+
+            # Configure voice
+            self.select_voice()
+            self.voice_engine.setProperty('rate', 180)
+
+            # One speech thread drains a queue, so runAndWait() is never re-entered
+            self.tts_queue = queue.Queue()
+            threading.Thread(target=self.tts_worker, daemon=True).start()
+
             self.voice_worker = VoiceWorker(self.voice_recognizer)
 
             # Connect signals
@@ -670,17 +986,39 @@ Just tell me what you need help with! 😊""")
             # Start the voice recognition thread
             self.voice_worker.start()
 
-            # Configure voice
-            voices = self.voice_engine.getProperty('voices')
-            if voices:
-                self.voice_engine.setProperty('voice', voices[0].id)
-            self.voice_engine.setProperty('rate', 180)
-
             print("VOICE: Initialized successfully")
 
         except Exception as e:
             print(f"VOICE: Initialization failed: {e}")
 
+    def select_voice(self):
+        """Apply the saved TTS voice, or pick the first system voice and save it"""
+        try:
+            voice_id = json.loads(VOICE_SETTINGS_FILE.read_text(encoding='utf-8'))['voice_id']
+            self.voice_engine.setProperty('voice', voice_id)
+            return
+        except Exception:
+            pass  # First run, or the saved voice is gone
+
+        voices = self.voice_engine.getProperty('voices')
+        if voices:
+            self.voice_engine.setProperty('voice', voices[0].id)
+            try:
+                VOICE_SETTINGS_FILE.write_text(json.dumps({'voice_id': voices[0].id}), encoding='utf-8')
+            except OSError as e:
+                print(f"VOICE: Could not save voice setting: {e}")
+
+    def tts_worker(self):
+        """Speak queued responses one at a time (speech thread)"""
+        while True:
+            text = self.tts_queue.get()
+            try:
+                self.voice_engine.say(text)
+                self.voice_engine.runAndWait()
+            except Exception as e:
+                print(f"SPEECH ERROR: {e}")
+                self.message_received.emit("System", f"VOICE ERROR: {e}")
+
     def toggle_voice_listening(self):
         """Toggle voice listening on/off"""
         if not VOICE_AVAILABLE:
@@ -698,18 +1036,7 @@ Just tell me what you need help with! 😊""")
             self.voice_listening = True
             self.voice_worker.start_listening()
             self.voice_button.setText("STOP")
-            self.voice_button.setStyleSheet("""
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #e53e3e, stop:1 #c53030);
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    padding: 10px 20px;
-                    font-weight: bold;
-                    font-family: 'Segoe UI', sans-serif;
-                }
-            """)
+            self.set_button_state(self.voice_button, "on")
 
     def stop_voice_listening(self):
         """Stop voice recognition"""
@@ -717,18 +1044,7 @@ Just tell me what you need help with! 😊""")
             self.voice_listening = False
             self.voice_worker.stop_listening()
             self.voice_button.setText("VOICE")
-            self.voice_button.setStyleSheet("""
-                QPushButton {
-                    background: qlineargradient(x1:0, y1:0, x2:0, y2:1,
-                        stop:0 #48bb78, stop:1 #38a169);
-                    color: white;
-                    border: none;
-                    border-radius: 25px;
-                    padding: 10px 20px;
-                    font-weight: bold;
-                    font-family: 'Segoe UI', sans-serif;
-                }
-            """)
+            self.set_button_state(self.voice_button, "off")
 
     def update_status(self, status):
         """Update status label"""
@@ -755,24 +1071,14 @@ Just tell me what you need help with! 😊""")
 
     def speak_response(self, text):
         """Speak the response"""
-        if not VOICE_AVAILABLE or not self.voice_engine or not self.voice_output_enabled:
+        if not VOICE_AVAILABLE or not self.tts_queue or not self.voice_output_enabled:
             return
 
         try:
-            clean_text = text.replace('✅', '').replace('❌', '').replace('🤖', 'AI')
-            clean_text = clean_text.replace('💡', '').replace('🔧', '').replace('🧹', '')
-
-            def speak():
-                try:
-                    self.voice_engine.say(clean_text)
-                    self.voice_engine.runAndWait()
-                except Exception as e:
-                    print(f"SPEECH ERROR: {e}")
-                    self.add_message("System", f"VOICE ERROR: {e}")
+            clean_text = text.translate(SPEECH_STRIP_TABLE)
 
-            # Use daemon thread to prevent blocking
-            speech_thread = threading.Thread(target=speak, daemon=True)
-            speech_thread.start()
+            # Spoken by tts_worker after anything already queued
+            self.tts_queue.put(clean_text)
 
         except Exception as e:
             print(f"SPEECH ERROR: {e}")
@@ -791,34 +1097,33 @@ Just tell me what you need help with! 😊""")
         self.inputs_enabled.emit(False)
         self.status_updated.emit("Processing...")
 
-        # Process command in thread
-        def process_thread():
-            try:
-                response = self.execute_command(message)
-                self.message_received.emit("Assistant", response)
-                self.status_updated.emit("Ready")
+        # Process command on a pooled thread
+        self.pool.start(CommandTask(self, message))
 
-                # Learn from this interaction
-                self.knowledge_manager.learn_from_query(message, response, "user_interaction")
+    def run_command(self, message):
+        """Execute a chat command and post the reply through signals (worker thread)"""
+        try:
+            response = self.execute_command(message)
+            self.message_received.emit("Assistant", response)
+            self.status_updated.emit("Ready")
 
-                # Speak response
-                if VOICE_AVAILABLE and self.voice_output_enabled:
-                    speech_thread = threading.Thread(target=lambda: self.speak_response(response), daemon=True)
-                    speech_thread.start()
+            # Learn from this interaction
+            self.knowledge_manager.learn_from_query(message, response, "user_interaction")
 
-            except Exception as e:
-                error_msg = f"ERROR: {str(e)}"
-                self.message_received.emit("Assistant", error_msg)
-                self.status_updated.emit("Ready")
+            # Speak response (queued for the speech thread)
+            if VOICE_AVAILABLE and self.voice_output_enabled:
+                self.speak_response(response)
 
-                # Learn from errors too
-                self.knowledge_manager.learn_from_query(message, error_msg, "error_case")
+        except Exception as e:
+            error_msg = f"ERROR: {str(e)}"
+            self.message_received.emit("Assistant", error_msg)
+            self.status_updated.emit("Ready")
 
-            finally:
-                self.inputs_enabled.emit(True)
+            # Learn from errors too
+            self.knowledge_manager.learn_from_query(message, error_msg, "error_case")
 
-        thread = threading.Thread(target=process_thread, daemon=True)
-        thread.start()
+        finally:
+            self.inputs_enabled.emit(True)
 
     def execute_command(self, command):
         """Execute natural language commands with conversational responses"""
@@ -1532,9 +1837,10 @@ ADDITIONAL TIPS:
     def get_learning_stats(self):
         """Get learning statistics"""
         try:
-            # Get learning statistics from database
-            with sqlite3.connect(self.knowledge_manager.db_path) as conn:
-                cursor = conn.cursor()
+            # Get learning statistics from database, including entries still queued
+            self.knowledge_manager.flush_learning()
+            with self.knowledge_manager.lock:
+                cursor = self.knowledge_manager.conn.cursor()
 
                 # Count total knowledge entries
                 cursor.execute('SELECT COUNT(*) FROM knowledge')
@@ -1599,6 +1905,58 @@ RECENT LEARNING ACTIVITY:
         except Exception as e:
             return f"ERROR: Could not store knowledge: {str(e)}"
 
+    def add_message(self, sender, message):
+        """Add message to chat display"""
+        self.conversation_history.append((sender, message))
+        self._history_dirty = True
+
+        timestamp = datetime.now().strftime("%H:%M")
+        self.chat_display.append(f"[{timestamp}] <b>{sender}:</b> {message}")
+        self.chat_display.append("")
+
+        # Auto scroll
+        scrollbar = self.chat_display.verticalScrollBar()
+        scrollbar.setValue(scrollbar.maximum())
+
+    def load_conversation_history(self):
+        """Load conversation history"""
+        history_file = Path.home() / ".desktop_ai_history.json"
+        try:
+            if history_file.exists():
+                with open(history_file, 'r', encoding='utf-8') as f:
+                    self.conversation_history = json.load(f)
+        except Exception as e:
+            print(f"History load error: {e}")
+
+    def save_conversation_history(self):
+        """Save conversation history (no-op when nothing changed since the last save)"""
+        if not self._history_dirty:
+            return
+        history_file = Path.home() / ".desktop_ai_history.json"
+        try:
+            with open(history_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps(self.conversation_history[-100:], ensure_ascii=False, separators=(',', ':')))
+            self._history_dirty = False
+        except Exception as e:
+            print(f"History save error: {e}")
+
+    def mousePressEvent(self, event):
+        """Handle mouse press for window dragging"""
+        if event.button() == Qt.LeftButton:
+            self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
+            event.accept()
+
+    def mouseMoveEvent(self, event):
+        """Handle mouse move for window dragging"""
+        if event.buttons() == Qt.LeftButton:
+            self.move(event.globalPos() - self.drag_position)
+            event.accept()
+
+    def closeEvent(self, event):
+        """Handle close event"""
+        event.ignore()
+        self.hide_to_tray()
+
 class NaturalLanguageProcessor:
     """Advanced natural language processing for conversational AI responses"""
 
@@ -1767,56 +2125,6 @@ class NaturalLanguageProcessor:
             ]
             return f"{random.choice(self.confused_responses)}\n\n{random.choice(suggestions)}"
 
-class DesktopAI(QWidget):
-
-    def add_message(self, sender, message):
-        """Add message to chat display"""
-        self.conversation_history.append((sender, message))
-
-        timestamp = datetime.now().strftime("%H:%M")
-        self.chat_display.append(f"[{timestamp}] <b>{sender}:</b> {message}")
-        self.chat_display.append("")
-
-        # Auto scroll
-        scrollbar = self.chat_display.verticalScrollBar()
-        scrollbar.setValue(scrollbar.maximum())
-
-    def load_conversation_history(self):
-        """Load conversation history"""
-        history_file = Path.home() / ".desktop_ai_history.json"
-        try:
-            if history_file.exists():
-                with open(history_file, 'r', encoding='utf-8') as f:
-                    self.conversation_history = json.load(f)
-        except Exception as e:
-            print(f"History load error: {e}")
-
-    def save_conversation_history(self):
-        """Save conversation history"""
-        history_file = Path.home() / ".desktop_ai_history.json"
-        try:
-            with open(history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.conversation_history[-100:], f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"History save error: {e}")
-
-    def mousePressEvent(self, event):
-        """Handle mouse press for window dragging"""
-        if event.button() == Qt.LeftButton:
-            self.drag_position = event.globalPos() - self.frameGeometry().topLeft()
-            event.accept()
-
-    def mouseMoveEvent(self, event):
-        """Handle mouse move for window dragging"""
-        if event.buttons() == Qt.LeftButton:
-            self.move(event.globalPos() - self.drag_position)
-            event.accept()
-
-    def closeEvent(self, event):
-        """Handle close event"""
-        event.ignore()
-        self.hide_to_tray()
-
 
 def main():
     """Main application entry point"""
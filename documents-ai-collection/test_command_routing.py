@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Command routing tests for the Desktop AI Assistant
+"""
+
+from desktop_ai_assistant_fixed import DesktopAI, ROUTE_MATCHER
+
+
+def test_forget_only_as_whole_command():
+    """Only a bare "forget" clears the response cache"""
+    assert DesktopAI.route_command("forget") == "forget"
+    assert DesktopAI.route_command("forget cache ") == "forget"
+    assert DesktopAI.route_command("unforgettable songs") == "ai"
+
+
+def test_forget_inside_note_reaches_its_handler():
+    """A note that mentions forgetting is not swallowed by cache control or the installer"""
+    assert DesktopAI.route_command("note don't forget milk") == "ai"
+    assert DesktopAI.route_command("forgetting help") == "help"
+
+
+def test_short_keywords_match_whole_words():
+    """Short route keywords do not fire inside longer words"""
+    assert 'install' not in ROUTE_MATCHER.match("forget the target budget")
+    assert 'greeting' not in ROUTE_MATCHER.match("this is which")
+    assert DesktopAI.route_command("get chrome") == "install"
+    assert DesktopAI.route_command("hi there") == "greeting"
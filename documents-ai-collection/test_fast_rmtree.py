@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+io_uring tree deletion tests for the Desktop AI Assistant
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("liburing")
+
+import desktop_ai_assistant_fixed as assistant
+
+pytestmark = pytest.mark.skipif(not assistant.LIBURING_AVAILABLE, reason="io_uring needs Linux")
+
+
+def make_tree(root, n_files):
+    """Create n_files files spread over two nested directories"""
+    nested = root / "a" / "b"
+    nested.mkdir(parents=True)
+    for i in range(n_files):
+        (nested if i % 2 else root / "a").joinpath(f"f{i}").write_bytes(b"x")
+
+
+def test_uring_unlink_all_reports_failures(tmp_path):
+    """Each completion is checked: a directory cannot be unlinked, a missing file is not an error"""
+    files = []
+    for i in range(3):
+        file_path = tmp_path / f"f{i}"
+        file_path.write_bytes(b"x")
+        files.append(str(file_path))
+    directory = tmp_path / "dir"
+    directory.mkdir()
+
+    failed = assistant.uring_unlink_all(files + [str(directory), str(tmp_path / "missing")])
+
+    assert failed == [str(directory)]
+    assert sorted(os.listdir(tmp_path)) == ["dir"]
+
+
+def test_fast_rmtree_spans_batches_and_keeps_link_targets(tmp_path):
+    """More files than one batch are removed; a directory symlink is removed, not followed"""
+    tree = tmp_path / "cache"
+    make_tree(tree, assistant.URING_BATCH * 2 + 7)
+    target = tmp_path / "target"
+    target.mkdir()
+    (target / "keep").write_bytes(b"x")
+    (tree / "link").symlink_to(target, target_is_directory=True)
+
+    assistant.fast_rmtree(str(tree))
+
+    assert not tree.exists()
+    assert (target / "keep").exists()